@@ -0,0 +1,34 @@
+import pytest
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+
+# Certificate verification is disabled on purpose for local API runs; silence
+# the warning once here rather than walking the warning filters on every call.
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+@pytest.fixture(scope="session")
+def api_session():
+    """
+    Provide a ``requests.Session`` shared by all integration tests.
+
+    Reusing one session keeps the underlying connection pool warm, so only the
+    first request to the API pays for the TCP (and TLS) handshake.
+
+    The pool is sized to the 16-thread fan-out in
+    ``test_page_consistency_removing_dead_links``, and ``pool_block`` makes
+    overflowing threads wait for a warm connection rather than open (and then
+    discard) a fresh one.
+    """
+
+    session = requests.Session()
+    session.verify = False
+    adapter = HTTPAdapter(
+        pool_connections=16, pool_maxsize=16, max_retries=0, pool_block=True
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    yield session
+    session.close()
@@ -1,11 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 from test.constants import API_URL
 from unittest.mock import patch
 from uuid import uuid4
 
 from django.conf import settings
 
+import orjson
 import pytest
-import requests
 from fakeredis import FakeRedis
 
 from catalog.api.controllers.search_controller import DEAD_LINK_RATIO
@@ -166,13 +167,13 @@ def test_dead_link_filtering_all_dead_links(
 
 
 @pytest.fixture
-def search_factory(client):
+def search_factory(client, api_session):
     """Allow passing url parameters along with a search request."""
 
     def _parameterized_search(**kwargs):
-        response = requests.get(f"{API_URL}/v1/images", params=kwargs, verify=False)
+        response = api_session.get(f"{API_URL}/v1/images", params=kwargs)
         assert response.status_code == 200
-        parsed = response.json()
+        parsed = orjson.loads(response.content)
         return parsed
 
     return _parameterized_search
@@ -189,6 +190,7 @@ def search_without_dead_links(search_factory):
 
 
 @pytest.mark.django_db
+@pytest.mark.network
 def test_page_size_removing_dead_links(search_without_dead_links):
     """
     Test whether the number of results returned is equal to the requested page size.
@@ -203,35 +205,36 @@ def test_page_size_removing_dead_links(search_without_dead_links):
 
 
 @pytest.mark.django_db
+@pytest.mark.network
 def test_page_consistency_removing_dead_links(search_without_dead_links):
     """Test that results in consecutive pages don't repeat when filtering dead links."""
 
     total_pages = settings.MAX_PAGINATION_DEPTH
     page_size = 5
 
-    page_results = []
-    for page in range(1, total_pages + 1):
-        page_data = search_without_dead_links(q="*", page_size=page_size, page=page)
-        page_results += page_data["results"]
-
-    def no_duplicates(xs):
-        s = set()
-        for x in xs:
-            if x in s:
-                return False
-            s.add(x)
-        return True
+    # The pages are independent of each other until the final uniqueness
+    # check, so they can be requested concurrently over the shared session.
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        pages = list(
+            executor.map(
+                lambda page: search_without_dead_links(
+                    q="*", page_size=page_size, page=page
+                ),
+                range(1, total_pages + 1),
+            )
+        )
+    page_results = [result for page_data in pages for result in page_data["results"]]
 
-    ids = list(map(lambda x: x["id"], page_results))
+    ids = [result["id"] for result in page_results]
     # No results should be repeated so we should have no duplicate ids
-    assert no_duplicates(ids)
+    assert len(set(ids)) == len(ids)
 
 
 @pytest.mark.django_db
-def test_max_page_count():
-    response = requests.get(
+@pytest.mark.network
+def test_max_page_count(api_session):
+    response = api_session.get(
         f"{API_URL}/v1/images",
         params={"page": settings.MAX_PAGINATION_DEPTH + 1},
-        verify=False,
     )
     assert response.status_code == 400